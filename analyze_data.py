@@ -1,9 +1,16 @@
 import pandas as pd
 import numpy as np
 
+from profiling import profiler_from_args
+
+# Opt-in profiling: --profile or BITURBO_PROFILE=1
+profiler = profiler_from_args('analyze_data')
+
 # Load the data
+profiler.checkpoint('load')
 df = pd.read_csv('biturbo_listings.csv')
 
+profiler.checkpoint('dataset overview')
 print("="*80)
 print("DATASET OVERVIEW")
 print("="*80)
@@ -12,6 +19,7 @@ print(f"\nColumns: {df.columns.tolist()}")
 print(f"\nData types:\n{df.dtypes}")
 print(f"\nMissing values:\n{df.isnull().sum()}")
 
+profiler.checkpoint('price analysis')
 print("\n" + "="*80)
 print("PRICE ANALYSIS")
 print("="*80)
@@ -20,12 +28,14 @@ df['price'] = pd.to_numeric(df['price'], errors='coerce')
 print(f"Price statistics (AZN):")
 print(df[df['currency'] == 'AZN']['price'].describe())
 
+profiler.checkpoint('brand analysis')
 print("\n" + "="*80)
 print("BRAND ANALYSIS")
 print("="*80)
 print(f"Top 15 brands by listing count:")
 print(df['brand'].value_counts().head(15))
 
+profiler.checkpoint('model analysis (top brands)')
 print("\n" + "="*80)
 print("MODEL ANALYSIS (TOP BRANDS)")
 print("="*80)
@@ -34,6 +44,7 @@ for brand in top_brands:
     print(f"\n{brand} - Top 5 models:")
     print(df[df['brand'] == brand]['model'].value_counts().head(5))
 
+profiler.checkpoint('year analysis')
 print("\n" + "="*80)
 print("YEAR ANALYSIS")
 print("="*80)
@@ -42,21 +53,25 @@ print(f"Year range: {df['year'].min()} - {df['year'].max()}")
 print(f"\nTop 10 years by listing count:")
 print(df['year'].value_counts().head(10))
 
+profiler.checkpoint('transmission analysis')
 print("\n" + "="*80)
 print("TRANSMISSION ANALYSIS")
 print("="*80)
 print(df['transmission'].value_counts())
 
+profiler.checkpoint('fuel type analysis')
 print("\n" + "="*80)
 print("FUEL TYPE ANALYSIS")
 print("="*80)
 print(df['fuel_type'].value_counts())
 
+profiler.checkpoint('body type analysis')
 print("\n" + "="*80)
 print("BODY TYPE ANALYSIS")
 print("="*80)
 print(df['body_type'].value_counts())
 
+profiler.checkpoint('views analysis')
 print("\n" + "="*80)
 print("VIEWS ANALYSIS")
 print("="*80)
@@ -66,6 +81,7 @@ print(df['views'].describe())
 print(f"\nTop 10 most viewed listings:")
 print(df.nlargest(10, 'views')[['brand', 'model', 'year', 'price', 'views']])
 
+profiler.checkpoint('price by brand (top 10 brands)')
 print("\n" + "="*80)
 print("PRICE BY BRAND (TOP 10 BRANDS)")
 print("="*80)
@@ -74,6 +90,7 @@ for brand in top_10_brands:
     brand_data = df[df['brand'] == brand]['price']
     print(f"{brand}: Mean={brand_data.mean():.0f} AZN, Median={brand_data.median():.0f} AZN")
 
+profiler.checkpoint('mileage analysis')
 print("\n" + "="*80)
 print("MILEAGE ANALYSIS")
 print("="*80)
@@ -82,17 +99,20 @@ df['mileage_numeric'] = df['mileage'].str.extract('(\d+)').astype(float)
 print(f"Mileage statistics (km):")
 print(df['mileage_numeric'].describe())
 
+profiler.checkpoint('price vs views correlation')
 print("\n" + "="*80)
 print("PRICE vs VIEWS CORRELATION")
 print("="*80)
 correlation = df[['price', 'views']].corr()
 print(correlation)
 
+profiler.checkpoint('color preferences')
 print("\n" + "="*80)
 print("COLOR PREFERENCES")
 print("="*80)
 print(df['color'].value_counts().head(10))
 
+profiler.checkpoint('drivetrain analysis')
 print("\n" + "="*80)
 print("DRIVETRAIN ANALYSIS")
 print("="*80)
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Biturbo.az Session Benchmark
+Compares a cold HTTP session against one warmed up in the background, end to end
+(session open, first index page, detail pages), on a local mock server that
+delays the first request of every new connection, standing in for DNS + TCP + TLS setup
+"""
+
+import asyncio
+import logging
+import sys
+import time
+
+from aiohttp import web
+
+from biturbo_scraper_async import BiturboScraperAsync, install_fast_event_loop
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+MOCK_INDEX_PAGE = "".join(
+    f'<div class="products-i"><a class="products-i-link" href="/az/avtomobil-elanlari/honda-accord-{i}/">x</a></div>'
+    for i in range(40)
+)
+
+MOCK_DETAIL_PAGE = """<html><body>
+<h2 class="product-name">Honda Accord, 2.4 L, 2015 il, 184 km</h2>
+<div class="product-price">27 000 AZN</div>
+<div class="product-statistics"><p>Elanın nömrəsi: 491352</p><p>Baxışların sayı: 601</p></div>
+</body></html>"""
+
+
+async def start_mock_server(port, connection_delay):
+    """Serve an index page and detail pages, sleeping on the first request of each connection"""
+    seen_connections = set()
+
+    async def handle(request):
+        connection = id(request.transport)
+        if connection not in seen_connections:
+            seen_connections.add(connection)
+            await asyncio.sleep(connection_delay)
+        page = MOCK_INDEX_PAGE if request.path.startswith('/az/axtar') else MOCK_DETAIL_PAGE
+        return web.Response(text=page, content_type='text/html')
+
+    app = web.Application()
+    app.router.add_route('*', '/{tail:.*}', handle)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, '127.0.0.1', port).start()
+    return runner
+
+
+async def time_crawl(base_url, requests, warmup_connections):
+    """Seconds from opening the session to finishing the first batch of detail pages, warm-up included"""
+    start_time = time.perf_counter()
+    async with BiturboScraperAsync(max_concurrent=10, warmup_connections=warmup_connections,
+                                   base_url=base_url) as scraper:
+        listing_urls = await scraper.extract_listing_urls(f"{base_url}/az/axtar/")
+        semaphore = asyncio.Semaphore(scraper.max_concurrent)
+        await asyncio.gather(*(scraper.get_page(url, semaphore) for url in listing_urls[:requests]))
+    return time.perf_counter() - start_time
+
+
+async def main(requests=20, connection_delay=0.2, port=8765):
+    runner = await start_mock_server(port, connection_delay)
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        cold = await time_crawl(base_url, requests, warmup_connections=0)
+        warm = await time_crawl(base_url, requests, warmup_connections=5)
+    finally:
+        await runner.cleanup()
+
+    logger.info(f"Cold session:   index page + {requests} detail pages in {cold:.3f} seconds")
+    logger.info(f"Warmed session: index page + {requests} detail pages in {warm:.3f} seconds")
+    logger.info(f"Speedup: {cold / warm:.2f}x")
+
+
+if __name__ == "__main__":
+    try:
+        requests = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+        connection_delay = float(sys.argv[2]) if len(sys.argv) > 2 else 0.2
+    except ValueError:
+        print("Usage: python3 benchmark_session.py [requests] [connection_delay_seconds]")
+        sys.exit(1)
+
+    install_fast_event_loop()
+    asyncio.run(main(requests, connection_delay))
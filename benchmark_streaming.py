@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Biturbo.az Streaming Benchmark
+Compares reading whole detail pages against streaming them up to the similar-listings
+block, end to end (fetch, extract, parse), on a local mock server serving pages of
+realistic size, a third of them without the optional phone, extras and description blocks
+"""
+
+import asyncio
+import logging
+import sys
+import time
+
+from aiohttp import web
+
+from biturbo_scraper_async import BiturboScraperAsync, install_fast_event_loop
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+MOCK_HEADER = (
+    '<html><head><style>' + '.nav-item{margin:0 4px;padding:2px}' * 600 + '</style>'
+    '<script>' + 'window.dataLayer.push({"event":"view"});' * 300 + '</script></head><body>'
+    '<nav>' + '<a class="nav-item" href="/az/">Marka</a>' * 200 + '</nav>'
+)
+
+MOCK_PRODUCT_SECTION = (
+    '<h2 class="product-name">Honda Accord, 2.4 L, 2015 il, 184 000 km</h2>'
+    '<div class="product-price"><span>27 000</span> AZN</div>'
+    '<div class="seller-name"><p>Elxan</p></div>'
+    '{phone}'
+    '<div class="product-statistics"><p>Elanın nömrəsi: {listing_id}</p>'
+    '<p>Baxışların sayı: 601</p><p>Yeniləndi: 12 Mart 2024</p></div>'
+    '<ul class="product-properties">' + ''.join(
+        f'<li class="product-properties-i"><label>{label}</label><div class="product-properties-value">{value}</div></li>'
+        for label, value in [('Marka', 'Honda'), ('Model', 'Accord'), ('Buraxılış ili', '2015'),
+                             ('Ban növü', 'Sedan'), ('Rəng', 'Qara'), ('Mühərrikin həcmi', '2.4 L'),
+                             ('Yanacaq növü', 'Benzin'), ('Yürüş', '184 000 km'),
+                             ('Sürətlər qutusu', 'Avtomat'), ('Ötürücü', 'Ön')]
+    ) + '</ul>'
+    '{extras}{description}'
+)
+
+MOCK_SIMILAR_LISTINGS = '<section class="similar">' + ''.join(
+    f'<div class="products-i"><a class="products-i-link" href="/az/avtomobil-elanlari/honda-civic-{i}/">'
+    f'<img src="/photos/{i}.jpg" alt="Honda Civic"><div class="products-i-price">15 000 AZN</div>'
+    f'<div class="products-i-name">Honda Civic, 1.8 L, 2012 il, 150 000 km</div></a></div>'
+    for i in range(40)
+) + '</section>'
+
+MOCK_FOOTER = '<footer>' + '<p class="footer-link">Haqqımızda</p>' * 400 + '</footer></body></html>'
+
+
+def mock_detail_page(listing_id):
+    """A full detail page; every third listing lacks the optional blocks"""
+    optional = listing_id % 3 != 0
+    section = MOCK_PRODUCT_SECTION.format(
+        listing_id=listing_id,
+        phone='<a class="phone" href="tel:0503458178">050-345-81-78</a>' if optional else '',
+        extras='<div class="product-extras">' + '<p class="product-extras-i">ABS</p>' * 12 + '</div>' if optional else '',
+        description='<p class="product-text">' + 'Təcili satılır, ideal vəziyyətdədir. ' * 20 + '</p>' if optional else '',
+    )
+    return MOCK_HEADER + section + MOCK_SIMILAR_LISTINGS + MOCK_FOOTER
+
+
+async def start_mock_server(port):
+    """Serve detail pages keyed by the listing ID at the end of the path"""
+    async def handle(request):
+        listing_id = int(request.path.rstrip('/').rsplit('-', 1)[-1])
+        return web.Response(text=mock_detail_page(listing_id), content_type='text/html')
+
+    app = web.Application()
+    app.router.add_route('*', '/{tail:.*}', handle)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, '127.0.0.1', port).start()
+    return runner
+
+
+async def time_details(base_url, pages, stream_details):
+    """Seconds and decoded characters to fetch, extract and parse pages detail pages"""
+    async with BiturboScraperAsync(max_concurrent=10, warmup_connections=0, base_url=base_url,
+                                   stream_details=stream_details) as scraper:
+        decoded = 0
+        get_page = scraper.get_page
+
+        async def counting_get_page(*args, **kwargs):
+            nonlocal decoded
+            content = await get_page(*args, **kwargs)
+            decoded += len(content or '')
+            return content
+
+        scraper.get_page = counting_get_page
+        urls = [f"{base_url}/az/avtomobil-elanlari/honda-accord-{i}/" for i in range(pages)]
+        semaphore = asyncio.Semaphore(scraper.max_concurrent)
+
+        start_time = time.perf_counter()
+        records = await asyncio.gather(*(scraper.extract_listing_details(url, semaphore) for url in urls))
+        elapsed = time.perf_counter() - start_time
+
+    assert all(records), "every page should parse"
+    return elapsed, decoded
+
+
+async def main(pages=200, port=8766):
+    runner = await start_mock_server(port)
+    base_url = f"http://127.0.0.1:{port}"
+    # Keep per-page logging out of the timings
+    logging.getLogger('biturbo_scraper_async').setLevel(logging.WARNING)
+    try:
+        full, full_chars = await time_details(base_url, pages, stream_details=False)
+        streamed, streamed_chars = await time_details(base_url, pages, stream_details=True)
+    finally:
+        await runner.cleanup()
+
+    page_size = len(mock_detail_page(1))
+    logger.info(f"Page size: {page_size / 1024:.0f} KiB")
+    logger.info(f"Whole pages:    {pages} detail pages in {full:.3f} seconds, {full_chars / pages / 1024:.0f} KiB decoded per page")
+    logger.info(f"Streamed pages: {pages} detail pages in {streamed:.3f} seconds, {streamed_chars / pages / 1024:.0f} KiB decoded per page")
+    logger.info(f"Speedup: {full / streamed:.2f}x")
+
+
+if __name__ == "__main__":
+    try:
+        pages = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    except ValueError:
+        print("Usage: python3 benchmark_streaming.py [pages]")
+        sys.exit(1)
+
+    install_fast_event_loop()
+    asyncio.run(main(pages))
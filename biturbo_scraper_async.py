@@ -7,65 +7,355 @@ Scrapes car listings and detailed information from biturbo.az using asyncio and
 import aiohttp
 import asyncio
 from bs4 import BeautifulSoup
+import codecs
 import csv
+import hashlib
+import json
+import os
 import re
+from html.parser import HTMLParser
 from urllib.parse import urljoin
 import logging
 import time
 
+from dedupe_listings import ListingDedupeIndex, listing_order
+from fetch_scheduler import DetailFetchScheduler
+from profiling import StageProfiler, profiler_from_args
+
+# aiohttp decodes brotli ('br') responses when one of these packages is installed
+try:
+    import brotli  # noqa: F401
+    BROTLI_AVAILABLE = True
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        BROTLI_AVAILABLE = True
+    except ImportError:
+        BROTLI_AVAILABLE = False
+
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# View counter inside the product statistics, which changes on every request
+VIEWS_RE = re.compile(r'(Baxışların sayı(?:<[^>]*>|[^<\d])*)(\d+)')
+
+# Bytes read per chunk when streaming detail pages
+STREAM_CHUNK_SIZE = 16 * 1024
+
+# Consecutive failed refetches after which the daemon treats a listing as removed
+MAX_FETCH_FAILURES = 3
+
+# The product title opens the product section; the first listing card after it starts the
+# similar-listings block that always follows. Detail pages are cut there before extraction,
+# and streaming stops reading there, whichever optional blocks the listing has.
+PRODUCT_SECTION_MARKER = 'class="product-name"'
+SIMILAR_LISTINGS_MARKER = 'class="products-i'
+
+# Every (tag, class) block parse_listing_details reads; keep in sync with its soup.find() calls.
+# Only these blocks are hashed for change detection and handed to BeautifulSoup.
+DETAIL_SECTIONS = (
+    ('h2', 'product-name'),
+    ('div', 'product-price'),
+    ('div', 'seller-name'),
+    ('a', 'phone'),
+    ('div', 'product-statistics'),
+    ('ul', 'product-properties'),
+    ('div', 'product-extras'),
+    ('p', 'product-text'),
+)
+
+class ProductSectionWatcher(HTMLParser):
+    """Incremental HTML parser that collects the source of the given (tag, class) blocks
+
+    Only the first block of each section is collected, as soup.find() would
+    return it.
+    """
+
+    def __init__(self, sections):
+        super().__init__(convert_charrefs=False)
+        self.pending = set(sections)
+        self.open_sections = {}  # (tag, class) -> nesting depth of tag inside the block
+        self.parts = []          # Source of the open blocks, in page order
+
+    @property
+    def section_html(self):
+        return ''.join(self.parts)
+
+    def collect(self, text):
+        if self.open_sections:
+            self.parts.append(text)
+
+    def handle_starttag(self, tag, attrs):
+        for section in self.open_sections:
+            if section[0] == tag:
+                self.open_sections[section] += 1
+
+        classes = (dict(attrs).get('class') or '').split()
+        for section in self.pending:
+            if section[0] == tag and section[1] in classes and section not in self.open_sections:
+                self.open_sections[section] = 1
+
+        self.collect(self.get_starttag_text())
+
+    def handle_startendtag(self, tag, attrs):
+        # Self-closing tags such as <br/> never open or close a block
+        self.collect(self.get_starttag_text())
+
+    def handle_endtag(self, tag):
+        self.collect(f'</{tag}>')
+        for section in list(self.open_sections):
+            if section[0] == tag:
+                self.open_sections[section] -= 1
+                if self.open_sections[section] == 0:
+                    del self.open_sections[section]
+                    self.pending.discard(section)
+
+    def handle_data(self, data):
+        self.collect(data)
+
+    def handle_entityref(self, name):
+        self.collect(f'&{name};')
+
+    def handle_charref(self, name):
+        self.collect(f'&#{name};')
+
+
+def product_section_end(content):
+    """Index where the similar listings after the product section start, -1 if not (yet) seen"""
+    title = content.find(PRODUCT_SECTION_MARKER)
+    if title < 0:
+        return -1
+    marker = content.find(SIMILAR_LISTINGS_MARKER, title)
+    if marker < 0:
+        return -1
+    # Cut before the tag carrying the marker
+    return content.rfind('<', title, marker)
+
+
+def extract_product_sections(content):
+    """Source of the detail page blocks parse_listing_details reads, without the rest of the page"""
+    end = product_section_end(content)
+    watcher = ProductSectionWatcher(DETAIL_SECTIONS)
+    watcher.feed(content[:end] if end >= 0 else content)
+    return watcher.section_html
+
 class BiturboScraperAsync:
-    def __init__(self, max_concurrent=50):
-        self.base_url = "https://www.biturbo.az"
+    def __init__(self, max_concurrent=50, cache_file=None, dedupe=False,
+                 warmup_connections=5, dns_cache_ttl=600, keepalive_timeout=60,
+                 base_url="https://www.biturbo.az", stream_details=False, request_budget=None,
+                 profiler=None):
+        self.base_url = base_url
+        self.profiler = profiler or StageProfiler()  # No-op unless an enabled profiler is passed in
         self.max_concurrent = max_concurrent
+        self.request_budget = request_budget  # Max HTTP requests for this session, None = unlimited
+        self.requests_made = 0                # Every request issued: warm-up, index, detail and retries
+        self.stream_details = stream_details  # Stop reading detail pages where the similar listings start
+        self.limit_per_host = 5
         self.session = None
+        self.warmup_task = None
+
+        # Connection pool tuning
+        self.warmup_connections = warmup_connections  # Keepalive connections opened before the crawl
+        self.dns_cache_ttl = dns_cache_ttl            # Seconds to cache DNS lookups
+        self.keepalive_timeout = keepalive_timeout    # Seconds to keep idle connections open
+
+        # Parsed records keyed by listing_id, reused when the page content is unchanged
+        self.cache_file = cache_file
+        self.parse_cache = {}
+
+        # Flags cars reposted under a new listing_id
+        self.dedupe_index = ListingDedupeIndex() if dedupe else None
 
         # Headers to mimic a real browser
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
             'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
+            'Accept-Encoding': 'gzip, deflate, br' if BROTLI_AVAILABLE else 'gzip, deflate',
             'Connection': 'keep-alive',
             'Upgrade-Insecure-Requests': '1',
         }
 
     async def __aenter__(self):
         """Async context manager entry"""
-        connector = aiohttp.TCPConnector(limit=self.max_concurrent, limit_per_host=5)
+        self.session = self.create_session()
+        # Warm up in the background so connection setup overlaps the first index page fetch
+        self.warmup_task = asyncio.create_task(self.warm_up())
+        self.load_parse_cache()
+        return self
+
+    def create_session(self):
+        """Create the HTTP session with DNS caching and keepalive tuned for repeated requests to one host"""
+        connector = aiohttp.TCPConnector(
+            limit=self.max_concurrent,
+            limit_per_host=self.limit_per_host,
+            ttl_dns_cache=self.dns_cache_ttl,
+            keepalive_timeout=self.keepalive_timeout,
+        )
         timeout = aiohttp.ClientTimeout(total=30, connect=10)
-        self.session = aiohttp.ClientSession(
+        return aiohttp.ClientSession(
             connector=connector,
             timeout=timeout,
             headers=self.headers
         )
-        return self
+
+    async def warm_up(self):
+        """Open keepalive connections up front so the first page requests skip DNS and TLS handshakes"""
+        # With a request budget every request should return data; the first pages warm the pool anyway
+        if self.request_budget is not None:
+            return
+
+        # Leave one per-host slot free so the first real request never queues behind the warm-up
+        count = min(self.warmup_connections, self.limit_per_host - 1)
+        if count <= 0:
+            return
+
+        async def open_connection():
+            if not self.reserve_request():
+                return False
+            try:
+                async with self.session.head(self.base_url, allow_redirects=False):
+                    return True
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.debug(f"Warm-up request failed: {e}")
+                return False
+
+        start_time = time.time()
+        results = await asyncio.gather(*(open_connection() for _ in range(count)))
+        logger.info(f"Warmed up {sum(results)} of {count} connections in {time.time() - start_time:.2f} seconds")
+
+    def reserve_request(self):
+        """Count one request against the budget, False if the budget is already spent"""
+        if self.budget_spent():
+            return False
+        self.requests_made += 1
+        return True
+
+    def budget_spent(self):
+        return self.request_budget is not None and self.requests_made >= self.request_budget
+
+    def remaining_budget(self):
+        """Requests left in the budget, None when unlimited"""
+        if self.request_budget is None:
+            return None
+        return max(self.request_budget - self.requests_made, 0)
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async context manager exit"""
+        if self.warmup_task and not self.warmup_task.done():
+            self.warmup_task.cancel()
+            await asyncio.gather(self.warmup_task, return_exceptions=True)
         if self.session:
             await self.session.close()
+        self.save_parse_cache()
 
-    async def get_page(self, url, semaphore, retries=3):
+    def load_parse_cache(self):
+        """Load previously parsed records and their content hashes from disk"""
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return
+
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                self.parse_cache = json.load(f)
+            logger.info(f"Loaded {len(self.parse_cache)} cached listings from {self.cache_file}")
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not load parse cache {self.cache_file}: {e}")
+            self.parse_cache = {}
+
+    def save_parse_cache(self):
+        """Persist parsed records and their content hashes to disk"""
+        if not self.cache_file:
+            return
+
+        tmp_file = f"{self.cache_file}.tmp"
+        with self.profiler.stage('write cache'), open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.parse_cache, f, ensure_ascii=False)
+        os.replace(tmp_file, self.cache_file)
+        logger.info(f"Saved {len(self.parse_cache)} cached listings to {self.cache_file}")
+
+    def remember_listing(self, cache_key, content_hash, data):
+        """Store a parsed record with its content hash, fetch time and view velocity"""
+        now = time.time()
+        views_velocity = 0.0
+
+        previous = self.parse_cache.get(cache_key)
+        if previous and previous.get('record') and previous.get('fetched_at'):
+            elapsed_days = (now - previous['fetched_at']) / 86400
+            old_views = previous['record'].get('views', '')
+            new_views = data.get('views', '')
+            if elapsed_days > 0 and old_views.isdigit() and new_views.isdigit():
+                views_velocity = max(int(new_views) - int(old_views), 0) / elapsed_days
+
+        self.parse_cache[cache_key] = {
+            'hash': content_hash,
+            'record': data,
+            'fetched_at': now,
+            'views_velocity': views_velocity,
+        }
+
+    def remember_failure(self, cache_key):
+        """Record a failed fetch so the listing is not rescheduled first every wave
+
+        Listings never parsed successfully get an entry without a hash or record.
+        """
+        cached = self.parse_cache.setdefault(cache_key, {'hash': None, 'record': None, 'views_velocity': 0.0})
+        cached['fetched_at'] = time.time()
+        cached['failures'] = cached.get('failures', 0) + 1
+
+    @staticmethod
+    def listing_id_from_url(listing_url):
+        """Get the listing ID from a listing URL such as .../honda-accord-491352/"""
+        id_match = re.search(r'-(\d+)/?$', listing_url)
+        return id_match.group(1) if id_match else listing_url
+
+    @staticmethod
+    def content_hash(content):
+        """Hash the product sections of a detail page, ignoring the view counter"""
+        content = VIEWS_RE.sub('', content)
+        return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+    async def get_page(self, url, semaphore, retries=3, stream=False):
         """Get page content with error handling and retries"""
         async with semaphore:
             for attempt in range(retries):
+                if not self.reserve_request():
+                    logger.warning(f"Request budget spent, skipping {url}")
+                    return None
                 try:
-                    async with self.session.get(url) as response:
-                        response.raise_for_status()
-                        content = await response.text()
-                        return content
-                except aiohttp.ClientError as e:
-                    logger.warning(f"Attempt {attempt + 1} failed for {url}: {e}")
+                    with self.profiler.stage('fetch'):
+                        async with self.session.get(url) as response:
+                            response.raise_for_status()
+                            if stream:
+                                content = await self.read_product_section(response)
+                            else:
+                                content = await response.text()
+                            return content
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    logger.warning(f"Attempt {attempt + 1} failed for {url}: {e!r}")
                     if attempt < retries - 1:
                         await asyncio.sleep(2 ** attempt)  # Exponential backoff
                     else:
                         logger.error(f"Failed to fetch {url} after {retries} attempts")
                         return None
 
+    async def read_product_section(self, response):
+        """Read a detail page incrementally, stopping where the similar listings after the product section start
+
+        Leaving the body unread means the connection is closed rather than reused,
+        which is cheaper than downloading and decoding the rest of a large page.
+        """
+        decoder = codecs.getincrementaldecoder(response.charset or 'utf-8')(errors='replace')
+        content = ''
+
+        async for chunk in response.content.iter_chunked(STREAM_CHUNK_SIZE):
+            content += decoder.decode(chunk)
+            end = product_section_end(content)
+            if end >= 0:
+                return content[:end]
+
+        return content + decoder.decode(b'', final=True)
+
     async def extract_listing_urls(self, page_url):
         """Extract all car listing URLs from a listings page"""
         logger.info(f"Extracting listing URLs from: {page_url}")
@@ -75,17 +365,18 @@ class BiturboScraperAsync:
         if not content:
             return []
 
-        soup = BeautifulSoup(content, 'html.parser')
+        with self.profiler.stage('parse index'):
+            soup = BeautifulSoup(content, 'html.parser')
 
-        # Find all product items with links
-        listing_urls = []
-        product_items = soup.find_all('div', class_='products-i')
+            # Find all product items with links
+            listing_urls = []
+            product_items = soup.find_all('div', class_='products-i')
 
-        for item in product_items:
-            link_element = item.find('a', class_='products-i-link')
-            if link_element and link_element.get('href'):
-                full_url = urljoin(self.base_url, link_element['href'])
-                listing_urls.append(full_url)
+            for item in product_items:
+                link_element = item.find('a', class_='products-i-link')
+                if link_element and link_element.get('href'):
+                    full_url = urljoin(self.base_url, link_element['href'])
+                    listing_urls.append(full_url)
 
         logger.info(f"Found {len(listing_urls)} listing URLs")
         return listing_urls
@@ -94,10 +385,43 @@ class BiturboScraperAsync:
         """Extract detailed information from a single car listing"""
         logger.info(f"Extracting details from: {listing_url}")
 
-        content = await self.get_page(listing_url, semaphore)
+        cache_key = self.listing_id_from_url(listing_url)
+        content = await self.get_page(listing_url, semaphore, stream=self.stream_details)
         if not content:
+            # Running out of budget says nothing about the listing itself
+            if not self.budget_spent():
+                self.remember_failure(cache_key)
             return None
 
+        # Ads, tokens and similar listings around the product sections change between
+        # requests, so only the blocks the parser reads are hashed and parsed
+        with self.profiler.stage('extract'):
+            content = extract_product_sections(content)
+
+        # Reuse the previously parsed record when the listing has not changed
+        content_hash = self.content_hash(content)
+        cached = self.parse_cache.get(cache_key)
+        if cached and cached.get('hash') == content_hash:
+            data = dict(cached['record'])
+            data['url'] = listing_url
+            views_match = VIEWS_RE.search(content)
+            if views_match:
+                data['views'] = views_match.group(2)
+            self.remember_listing(cache_key, content_hash, data)
+            logger.info(f"Listing {cache_key} unchanged, reusing cached data")
+            return data
+
+        with self.profiler.stage('parse'):
+            data = self.parse_listing_details(listing_url, content)
+
+        if data:
+            self.remember_listing(cache_key, content_hash, data)
+        else:
+            self.remember_failure(cache_key)
+        return data
+
+    def parse_listing_details(self, listing_url, content):
+        """Parse the fields of a car listing from its detail page HTML or just its product sections"""
         soup = BeautifulSoup(content, 'html.parser')
 
         data = {
@@ -235,16 +559,19 @@ class BiturboScraperAsync:
         start_time = time.time()
 
         all_listing_urls = []
+        pages_visited = 0
 
         # Generate page URLs and extract listings from each page
         for page_num in range(start_page, end_page + 1):
-            if page_num == 1:
-                page_url = f"{base_url}/"
-            else:
-                page_url = f"{base_url}/{page_num}/"
+            if self.budget_spent():
+                logger.warning(f"Request budget spent, stopping before page {page_num}")
+                break
+
+            page_url = self.search_page_url(base_url, page_num)
 
             logger.info(f"Extracting listings from page {page_num}: {page_url}")
             page_listings = await self.extract_listing_urls(page_url)
+            pages_visited += 1
 
             if not page_listings:
                 logger.warning(f"No listings found on page {page_num}")
@@ -258,15 +585,32 @@ class BiturboScraperAsync:
             # Small delay between page requests
             await asyncio.sleep(1)
 
-        logger.info(f"Found total of {len(all_listing_urls)} listings across {end_page - start_page + 1} pages")
+        logger.info(f"Found total of {len(all_listing_urls)} listings across {pages_visited} pages")
+
+        # Order detail fetches by priority and cut them to what is left of the request budget;
+        # retries can still spend the remainder, in which case get_page stops issuing requests
+        scheduler = DetailFetchScheduler(self.parse_cache, self.listing_id_from_url)
+        scheduled_urls = scheduler.schedule(all_listing_urls, self.remaining_budget())
+        if len(scheduled_urls) < len(all_listing_urls):
+            logger.info(f"Request budget allows {len(scheduled_urls)} of {len(all_listing_urls)} detail fetches")
 
         # Create semaphore to limit concurrent requests
         semaphore = asyncio.Semaphore(self.max_concurrent)
 
-        # Create tasks for all listings
+        all_data = await self.fetch_listing_details(scheduled_urls, semaphore)
+
+        end_time = time.time()
+        logger.info(f"Scraping completed in {end_time - start_time:.2f} seconds")
+        logger.info(f"Successfully scraped {len(all_data)} out of {len(scheduled_urls)} listings")
+
+        return all_data
+
+    async def fetch_listing_details(self, listing_urls, semaphore):
+        """Fetch detail pages concurrently, dropping failures and duplicate listings"""
+        # Create tasks in priority order; the semaphore admits waiters first come, first served
         tasks = [
             self.extract_listing_details(url, semaphore)
-            for url in all_listing_urls
+            for url in listing_urls
         ]
 
         logger.info(f"Starting to scrape {len(tasks)} listings concurrently")
@@ -275,19 +619,147 @@ class BiturboScraperAsync:
         results = await asyncio.gather(*tasks, return_exceptions=True)
 
         # Filter out None results and exceptions
-        all_data = []
+        records = []
         for result in results:
             if isinstance(result, dict) and result:
-                all_data.append(result)
+                records.append(result)
             elif isinstance(result, Exception):
                 logger.error(f"Task failed with exception: {result}")
 
-        end_time = time.time()
-        logger.info(f"Scraping completed in {end_time - start_time:.2f} seconds")
-        logger.info(f"Successfully scraped {len(all_data)} out of {len(all_listing_urls)} listings")
+        # Drop duplicate listings, indexing the oldest first so reposts resolve to the original.
+        # Only listings kept in the output are indexed, never records from earlier runs: an
+        # original that has since been deleted must not take its repost down with it.
+        duplicates = set()
+        if self.dedupe_index is not None:
+            for record in sorted(records, key=lambda record: listing_order(record['listing_id'])):
+                duplicate_of = self.dedupe_index.add(record)
+                if duplicate_of:
+                    logger.info(f"Listing {record['listing_id']} duplicates listing {duplicate_of}, skipping")
+                    duplicates.add(id(record))
+                    # Lets the daemon fetch the repost again if the original is dropped
+                    cached = self.parse_cache.get(self.listing_id_from_url(record['url']))
+                    if cached:
+                        cached['duplicate_of'] = duplicate_of
+
+        if duplicates:
+            logger.info(f"Skipped {len(duplicates)} duplicate listings")
+
+        all_data = [record for record in records if id(record) not in duplicates]
 
         return all_data
 
+    async def run_daemon(self, stop_event, output_filename='biturbo_listings.csv',
+                         base_url="https://www.biturbo.az/az/axtar", poll_pages=2, poll_interval=120,
+                         recrawl_interval=1800, wave_size=200):
+        """Keep the output CSV current until stop_event is set
+
+        Every poll_interval seconds the first poll_pages index pages are checked
+        and unseen listings are fetched. Every recrawl_interval seconds a wave of
+        up to wave_size known listings is refetched in scheduler priority order;
+        listings that fail MAX_FETCH_FAILURES refetches in a row are dropped.
+        The output CSV is rewritten after each cycle that changed it and once
+        more on shutdown.
+        """
+        # Latest record per listing, starting from the previous output
+        listings = {}
+        if os.path.exists(output_filename):
+            with open(output_filename, newline='', encoding='utf-8') as csvfile:
+                for row in csv.DictReader(csvfile):
+                    listings[self.listing_id_from_url(row['url'])] = row
+            logger.info(f"Daemon resuming with {len(listings)} listings from {output_filename}")
+
+        if self.dedupe_index is not None:
+            for record in sorted(listings.values(), key=lambda record: listing_order(record['listing_id'])):
+                self.dedupe_index.add(record)
+
+        semaphore = asyncio.Semaphore(self.max_concurrent)
+        next_recrawl = time.time() + recrawl_interval
+        dirty = False
+
+        # Idle connections close between polls unless keepalive outlasts the poll interval
+        rewarm = self.keepalive_timeout <= poll_interval
+        if rewarm:
+            logger.warning(f"keepalive_timeout ({self.keepalive_timeout}s) <= poll_interval ({poll_interval}s), "
+                           "re-warming connections before each poll")
+
+        try:
+            while not stop_event.is_set():
+                # One failed poll, wave or write must not stop a long-running daemon
+                try:
+                    if rewarm:
+                        await self.warm_up()
+
+                    # Poll the newest index pages for listings we have not seen
+                    new_urls = []
+                    for page_num in range(1, poll_pages + 1):
+                        for url in await self.extract_listing_urls(self.search_page_url(base_url, page_num)):
+                            listing_id = self.listing_id_from_url(url)
+                            if listing_id in listings or url in new_urls:
+                                continue
+                            # Skip duplicates of listings we still have; retry listings whose first fetches failed
+                            cached = self.parse_cache.get(listing_id)
+                            if cached and cached['record'] and cached.get('duplicate_of') in listings:
+                                continue
+                            if cached and not cached['record'] and cached.get('failures', 0) >= MAX_FETCH_FAILURES:
+                                continue
+                            new_urls.append(url)
+
+                    if new_urls:
+                        logger.info(f"Found {len(new_urls)} new listings")
+                        for record in await self.fetch_listing_details(new_urls, semaphore):
+                            listings[self.listing_id_from_url(record['url'])] = record
+                            dirty = True
+
+                    # Refetch a wave of known listings, most valuable first
+                    if time.time() >= next_recrawl and not stop_event.is_set():
+                        scheduler = DetailFetchScheduler(self.parse_cache, self.listing_id_from_url)
+                        wave_urls = scheduler.schedule((record['url'] for record in listings.values()), wave_size)
+                        logger.info(f"Recrawling wave of {len(wave_urls)} listings")
+                        next_recrawl = time.time() + recrawl_interval
+                        for record in await self.fetch_listing_details(wave_urls, semaphore):
+                            listings[self.listing_id_from_url(record['url'])] = record
+                            dirty = True
+
+                        # Listings that keep failing have most likely been sold or removed
+                        for listing_id in list(listings):
+                            if self.parse_cache.get(listing_id, {}).get('failures', 0) >= MAX_FETCH_FAILURES:
+                                logger.info(f"Dropping listing {listing_id} after {MAX_FETCH_FAILURES} failed fetches")
+                                del listings[listing_id]
+                                del self.parse_cache[listing_id]
+                                if self.dedupe_index is not None:
+                                    self.dedupe_index.remove(listing_id)
+                                dirty = True
+
+                    if dirty:
+                        self.write_snapshot(listings.values(), output_filename)
+                        self.save_parse_cache()
+                        dirty = False
+                except Exception as e:
+                    logger.error(f"Daemon cycle failed: {e!r}")
+
+                try:
+                    await asyncio.wait_for(stop_event.wait(), timeout=poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            if dirty:
+                self.write_snapshot(listings.values(), output_filename)
+            logger.info("Daemon stopped")
+
+    def write_snapshot(self, data, filename):
+        """Replace filename with data in one step so readers never see a partial file"""
+        tmp_file = f"{filename}.tmp"
+        self.save_to_csv(list(data), filename=tmp_file)
+        if os.path.exists(tmp_file):
+            os.replace(tmp_file, filename)
+
+    @staticmethod
+    def search_page_url(base_url, page_num):
+        """URL of a search results page"""
+        if page_num == 1:
+            return f"{base_url}/"
+        return f"{base_url}/{page_num}/"
+
     def save_to_csv(self, data, filename='biturbo_listings_async.csv'):
         """Save scraped data to CSV file"""
         if not data:
@@ -303,7 +775,7 @@ class BiturboScraperAsync:
             'transmission', 'drivetrain', 'price', 'currency', 'views', 'updated_date', 'location', 'extras', 'description'
         ]
 
-        with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
+        with self.profiler.stage('write'), open(filename, 'w', newline='', encoding='utf-8') as csvfile:
             writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
             writer.writeheader()
 
@@ -312,18 +784,24 @@ class BiturboScraperAsync:
 
         logger.info(f"Data saved successfully to {filename}")
 
-async def main():
+async def main(profiler=None, start_page=1, end_page=50, output_filename='biturbo_listings.csv'):
     """Main function to run the async scraper"""
 
     # Configuration - easily changeable parameters
-    START_PAGE = 1          # Start from page 1
-    END_PAGE = 50          # End at page 50 (scrape pages 1-50, ~2000 listings)
+    START_PAGE = start_page  # Start from page 1 by default
+    END_PAGE = end_page      # End at page 50 by default (scrape pages 1-50, ~2000 listings)
     MAX_CONCURRENT = 10    # Number of concurrent requests
     MAX_LISTINGS_PER_PAGE = None  # None = all listings per page (40 per page)
-    OUTPUT_FILENAME = 'biturbo_listings.csv'
+    OUTPUT_FILENAME = output_filename
+    CACHE_FILENAME = 'biturbo_parse_cache.json'  # Content hashes + parsed records from previous runs
+    DEDUPE = True          # Skip cars reposted under a new listing ID
+    STREAM_DETAILS = False # Stop reading detail pages once every parsed block has closed
+    REQUEST_BUDGET = None  # Max requests per run (warm-up, index, detail pages and retries), None = unlimited
 
     try:
-        async with BiturboScraperAsync(max_concurrent=MAX_CONCURRENT) as scraper:
+        async with BiturboScraperAsync(max_concurrent=MAX_CONCURRENT, cache_file=CACHE_FILENAME, dedupe=DEDUPE,
+                                       stream_details=STREAM_DETAILS, request_budget=REQUEST_BUDGET,
+                                       profiler=profiler) as scraper:
             # Scrape listings from multiple pages
             data = await scraper.scrape_listings(
                 start_page=START_PAGE,
@@ -339,37 +817,81 @@ async def main():
     except Exception as e:
         logger.error(f"Async scraping failed: {e}")
 
+async def daemon_main(profiler=None):
+    """Run the scraper as a long-lived daemon until SIGINT or SIGTERM"""
+    import signal
+
+    # Configuration - easily changeable parameters
+    POLL_PAGES = 2           # Index pages checked for new listings each poll
+    POLL_INTERVAL = 120      # Seconds between polls
+    RECRAWL_INTERVAL = 1800  # Seconds between recrawl waves of known listings
+    WAVE_SIZE = 200          # Listings refetched per wave
+    MAX_CONCURRENT = 10      # Number of concurrent requests
+    OUTPUT_FILENAME = 'biturbo_listings.csv'
+    CACHE_FILENAME = 'biturbo_parse_cache.json'
+
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop_event.set)
+        except NotImplementedError:
+            pass  # Windows: Ctrl+C still raises KeyboardInterrupt
+
+    # Keep idle connections open across polls so every poll starts on a warm pool
+    async with BiturboScraperAsync(max_concurrent=MAX_CONCURRENT, cache_file=CACHE_FILENAME, dedupe=True,
+                                   keepalive_timeout=POLL_INTERVAL + 60, profiler=profiler) as scraper:
+        await scraper.run_daemon(
+            stop_event,
+            output_filename=OUTPUT_FILENAME,
+            poll_pages=POLL_PAGES,
+            poll_interval=POLL_INTERVAL,
+            recrawl_interval=RECRAWL_INTERVAL,
+            wave_size=WAVE_SIZE
+        )
+
+def install_fast_event_loop():
+    """Use uvloop for the asyncio event loop when it is installed"""
+    try:
+        import uvloop
+    except ImportError:
+        return False
+
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    logger.info("Using uvloop event loop")
+    return True
+
 def configure_and_run():
     """Function to configure scraping parameters and run"""
     import sys
 
+    # --profile: per-stage timings, CPU profile and top allocators written at exit
+    profiler = profiler_from_args('scraper')
+    install_fast_event_loop()
+
+    if len(sys.argv) > 1 and sys.argv[1] == '--daemon':
+        asyncio.run(daemon_main(profiler))
+        return
+
     if len(sys.argv) > 1:
         try:
             start_page = int(sys.argv[1])
             end_page = int(sys.argv[2]) if len(sys.argv) > 2 else start_page
-            print(f"Scraping pages {start_page} to {end_page}")
-
-            # Modify the main function parameters
-            async def configured_main():
-                async with BiturboScraperAsync(max_concurrent=10) as scraper:
-                    data = await scraper.scrape_listings(
-                        start_page=start_page,
-                        end_page=end_page,
-                        max_listings_per_page=None
-                    )
-                    scraper.save_to_csv(data, filename=f'biturbo_pages_{start_page}_to_{end_page}.csv')
-                    logger.info("Configured scraping completed successfully!")
-
-            asyncio.run(configured_main())
-            return
-
         except ValueError:
             print("Usage: python3 biturbo_scraper_async.py [start_page] [end_page]")
+            print("       python3 biturbo_scraper_async.py --daemon")
+            print("Add --profile to write per-stage timings and CPU/memory profiles at exit")
             print("Example: python3 biturbo_scraper_async.py 1 5  # Scrapes pages 1-5")
             sys.exit(1)
 
+        print(f"Scraping pages {start_page} to {end_page}")
+
+        # Same settings as the default run, only the page range and output file differ
+        asyncio.run(main(profiler, start_page, end_page, f'biturbo_pages_{start_page}_to_{end_page}.csv'))
+        return
+
     # Run default configuration
-    asyncio.run(main())
+    asyncio.run(main(profiler))
 
 if __name__ == "__main__":
     # Check if aiohttp is available
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Biturbo.az Duplicate Listing Detection
+Finds cars reposted under new listing IDs using an exact key index on normalised
+car attributes plus SimHash over the description and extras text
+"""
+
+import csv
+import hashlib
+import logging
+import re
+import sys
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+SIMHASH_BITS = 64
+SIMHASH_BANDS = 4  # Hamming distance < SIMHASH_BANDS guarantees a shared band
+MAX_HAMMING_DISTANCE = 3
+BAND_BITS = SIMHASH_BITS // SIMHASH_BANDS
+BAND_MASK = (1 << BAND_BITS) - 1
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def normalise_text(value):
+    """Lowercase and collapse whitespace"""
+    return ' '.join(str(value or '').lower().split())
+
+
+def normalise_number(value):
+    """Keep only the digits of a value such as '184 km' or '050-345-81-78'"""
+    return re.sub(r'\D', '', str(value or ''))
+
+
+def listing_key(record):
+    """Exact key on the attributes that identify a physical car and its seller"""
+    return (
+        normalise_text(record.get('brand')),
+        normalise_text(record.get('model')),
+        normalise_number(record.get('year')),
+        normalise_number(record.get('mileage')),
+        normalise_text(record.get('engine_volume')),
+        normalise_number(record.get('seller_phone')),
+    )
+
+
+def is_complete_key(key):
+    """Whether a key identifies a car; brand, model, year and phone must all be known"""
+    brand, model, year, _, _, phone = key
+    return bool(brand and model and year and phone)
+
+
+def listing_order(listing_id):
+    """Sort key putting numerically lower (older) listing IDs first"""
+    listing_id = str(listing_id or '')
+    return (0, int(listing_id), '') if listing_id.isdigit() else (1, 0, listing_id)
+
+
+def simhash(text):
+    """64-bit SimHash over word bigrams of the text, None when there is nothing to hash"""
+    tokens = TOKEN_RE.findall(normalise_text(text))
+    if not tokens:
+        return None
+
+    features = tokens if len(tokens) < 2 else [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    weights = [0] * SIMHASH_BITS
+    for feature in features:
+        h = int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'big')
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if h >> bit & 1 else -1
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+class ListingDedupeIndex:
+    """Index of seen listings that flags duplicates without pairwise comparisons
+
+    Exact duplicates are found through a dict on the normalised listing key.
+    Near duplicates are found by splitting each SimHash into bands and only
+    comparing listings that share a band with the same brand, model and year, so
+    lookups stay sub-linear as the index grows.
+    """
+
+    def __init__(self, max_distance=MAX_HAMMING_DISTANCE):
+        self.max_distance = max_distance
+        self.by_key = {}        # listing key -> listing_ids with that key
+        self.bands = {}         # band key -> listing_ids sharing that SimHash band
+        self.fingerprints = {}  # listing_id -> SimHash
+
+        # Reverse maps so a listing can be removed again
+        self.keys = {}          # listing_id -> listing key
+        self.band_keys = {}     # listing_id -> band keys
+
+    def __len__(self):
+        return len(self.keys.keys() | self.fingerprints.keys())
+
+    def _text_fingerprint(self, record):
+        # Extras alone are a standard checklist shared by many cars, so require a description
+        description = normalise_text(record.get('description'))
+        if not description:
+            return None
+        return simhash(f"{description} {record.get('extras', '')}")
+
+    def _band_keys(self, record, fingerprint):
+        car = (
+            normalise_text(record.get('brand')),
+            normalise_text(record.get('model')),
+            normalise_number(record.get('year')),
+        )
+        for band in range(SIMHASH_BANDS):
+            yield car + (band, fingerprint >> (band * BAND_BITS) & BAND_MASK)
+
+    def find_duplicate(self, record):
+        """Return the canonical listing_id that record duplicates, or None
+
+        The canonical listing of a group is the one with the lowest listing_id,
+        so the original is never flagged, whichever order listings arrive in.
+        """
+        listing_id = record.get('listing_id')
+        matches = []
+
+        key = listing_key(record)
+        if is_complete_key(key):
+            matches.extend(self.by_key.get(key, ()))
+
+        fingerprint = self._text_fingerprint(record)
+        if fingerprint is not None:
+            for band_key in self._band_keys(record, fingerprint):
+                for candidate in self.bands.get(band_key, ()):
+                    if bin(fingerprint ^ self.fingerprints[candidate]).count('1') <= self.max_distance:
+                        matches.append(candidate)
+
+        canonical = min(matches, key=listing_order, default=None)
+        if canonical is None or listing_order(canonical) >= listing_order(listing_id):
+            return None
+        return canonical
+
+    def add(self, record):
+        """Index record and return the listing_id it duplicates, or None
+
+        Duplicates are not indexed, so later lookups always resolve to the
+        canonical listing rather than to one of its reposts. Adding a listing
+        again replaces its previous entry.
+        """
+        listing_id = record.get('listing_id')
+        self.remove(listing_id)
+
+        duplicate_of = self.find_duplicate(record)
+        if duplicate_of:
+            return duplicate_of
+
+        key = listing_key(record)
+        if is_complete_key(key):
+            self.by_key.setdefault(key, set()).add(listing_id)
+            self.keys[listing_id] = key
+
+        fingerprint = self._text_fingerprint(record)
+        if fingerprint is not None:
+            self.fingerprints[listing_id] = fingerprint
+            self.band_keys[listing_id] = list(self._band_keys(record, fingerprint))
+            for band_key in self.band_keys[listing_id]:
+                self.bands.setdefault(band_key, []).append(listing_id)
+
+        return None
+
+    def remove(self, listing_id):
+        """Forget a listing, e.g. once it has been deleted, so reposts no longer resolve to it"""
+        key = self.keys.pop(listing_id, None)
+        if key is not None:
+            self.by_key[key].discard(listing_id)
+            if not self.by_key[key]:
+                del self.by_key[key]
+
+        self.fingerprints.pop(listing_id, None)
+        for band_key in self.band_keys.pop(listing_id, ()):
+            self.bands[band_key].remove(listing_id)
+            if not self.bands[band_key]:
+                del self.bands[band_key]
+
+
+def dedupe_csv(input_filename='biturbo_listings.csv', output_filename='biturbo_listings_deduped.csv'):
+    """Drop duplicate listings from a scraped CSV file, keeping the lowest listing_id of each group"""
+    index = ListingDedupeIndex()
+
+    with open(input_filename, newline='', encoding='utf-8') as infile:
+        reader = csv.DictReader(infile)
+        fieldnames = reader.fieldnames
+        rows = list(reader)
+
+    # Index oldest listings first so each group keeps its original
+    duplicate_ids = set()
+    for row in sorted(rows, key=lambda row: listing_order(row.get('listing_id'))):
+        duplicate_of = index.add(row)
+        if duplicate_of:
+            duplicate_ids.add(row.get('listing_id'))
+            logger.info(f"Listing {row.get('listing_id')} duplicates listing {duplicate_of}")
+
+    kept = 0
+    with open(output_filename, 'w', newline='', encoding='utf-8') as outfile:
+        writer = csv.DictWriter(outfile, fieldnames=fieldnames)
+        writer.writeheader()
+        for row in rows:
+            if row.get('listing_id') not in duplicate_ids:
+                writer.writerow(row)
+                kept += 1
+
+    duplicates = len(rows) - kept
+    logger.info(f"Kept {kept} listings, removed {duplicates} duplicates, saved to {output_filename}")
+    return duplicates
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 3:
+        print("Usage: python3 dedupe_listings.py [input_csv] [output_csv]")
+        sys.exit(1)
+    dedupe_csv(*sys.argv[1:])
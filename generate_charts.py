@@ -4,6 +4,11 @@ import seaborn as sns
 import numpy as np
 from datetime import datetime
 
+from profiling import profiler_from_args
+
+# Opt-in profiling: --profile or BITURBO_PROFILE=1
+profiler = profiler_from_args('generate_charts')
+
 # Set style for professional-looking charts
 sns.set_style("whitegrid")
 plt.rcParams['figure.figsize'] = (12, 6)
@@ -11,9 +16,11 @@ plt.rcParams['font.size'] = 10
 
 # Load data
 print("Loading data...")
+profiler.checkpoint('load')
 df = pd.read_csv('biturbo_listings.csv')
 
 # Data preprocessing
+profiler.checkpoint('preprocess')
 df['price'] = pd.to_numeric(df['price'], errors='coerce')
 df['year'] = pd.to_numeric(df['year'], errors='coerce')
 df['views'] = pd.to_numeric(df['views'], errors='coerce')
@@ -28,6 +35,7 @@ print("Generating charts...")
 
 # Chart 1: Market Share by Top 15 Brands
 print("1. Market share by brand...")
+profiler.checkpoint('chart 01')
 plt.figure(figsize=(12, 8))
 brand_counts = df['brand'].value_counts().head(15)
 colors = sns.color_palette("Blues_r", n_colors=15)
@@ -47,6 +55,7 @@ plt.close()
 
 # Chart 2: Average Price by Top 10 Brands
 print("2. Average price by brand...")
+profiler.checkpoint('chart 02')
 plt.figure(figsize=(12, 8))
 top_brands = df['brand'].value_counts().head(10).index
 brand_prices = df[df['brand'].isin(top_brands)].groupby('brand')['price'].mean().sort_values(ascending=True)
@@ -66,6 +75,7 @@ plt.close()
 
 # Chart 3: Listing Volume by Year (2000-2024)
 print("3. Listing trends by year...")
+profiler.checkpoint('chart 03')
 plt.figure(figsize=(14, 6))
 year_counts = df[(df['year'] >= 2000) & (df['year'] <= 2024)]['year'].value_counts().sort_index()
 plt.plot(year_counts.index, year_counts.values, marker='o', linewidth=2.5,
@@ -83,6 +93,7 @@ plt.close()
 
 # Chart 4: Transmission Type Distribution
 print("4. Transmission type preferences...")
+profiler.checkpoint('chart 04')
 plt.figure(figsize=(10, 6))
 transmission_counts = df['transmission'].value_counts()
 # Map to English for clarity
@@ -107,6 +118,7 @@ plt.close()
 
 # Chart 5: Average Price by Vehicle Age
 print("5. Price depreciation analysis...")
+profiler.checkpoint('chart 05')
 plt.figure(figsize=(14, 6))
 age_price = df[df['vehicle_age'] <= 30].groupby('vehicle_age')['price'].agg(['mean', 'median']).reset_index()
 plt.plot(age_price['vehicle_age'], age_price['mean'], marker='o', linewidth=2.5,
@@ -125,6 +137,7 @@ plt.close()
 
 # Chart 6: Color Preferences (Top 10)
 print("6. Color preferences...")
+profiler.checkpoint('chart 06')
 plt.figure(figsize=(12, 8))
 color_counts = df['color'].value_counts().head(10)
 colors_palette = sns.color_palette("Spectral", n_colors=10)
@@ -144,6 +157,7 @@ plt.close()
 
 # Chart 7: Drivetrain Distribution
 print("7. Drivetrain distribution...")
+profiler.checkpoint('chart 07')
 plt.figure(figsize=(10, 6))
 drivetrain_counts = df['drivetrain'].value_counts()
 # Map to English
@@ -168,6 +182,7 @@ plt.close()
 
 # Chart 8: Price Range Distribution
 print("8. Price range analysis...")
+profiler.checkpoint('chart 08')
 plt.figure(figsize=(14, 6))
 price_bins = [0, 5000, 10000, 15000, 20000, 25000, 30000, 40000, 50000, 100000, 350000]
 price_labels = ['0-5K', '5-10K', '10-15K', '15-20K', '20-25K', '25-30K', '30-40K', '40-50K', '50-100K', '100K+']
@@ -189,6 +204,7 @@ plt.close()
 
 # Chart 9: Top 20 Models by Listing Count
 print("9. Most popular models...")
+profiler.checkpoint('chart 09')
 plt.figure(figsize=(12, 10))
 # Combine brand and model
 df['brand_model'] = df['brand'] + ' ' + df['model']
@@ -210,6 +226,7 @@ plt.close()
 
 # Chart 10: Average Views by Price Range
 print("10. Engagement analysis...")
+profiler.checkpoint('chart 10')
 plt.figure(figsize=(14, 6))
 views_by_price = df.groupby('price_range')['views'].mean().sort_index()
 colors = sns.color_palette("coolwarm", n_colors=len(views_by_price))
@@ -230,6 +247,7 @@ plt.close()
 
 # Chart 11: Price Comparison - Top 5 Brands by Segment
 print("11. Brand price positioning...")
+profiler.checkpoint('chart 11')
 plt.figure(figsize=(14, 7))
 top_5_brands = df['brand'].value_counts().head(5).index
 brand_price_data = []
@@ -258,6 +276,7 @@ plt.close()
 
 # Chart 12: Mileage Distribution
 print("12. Mileage analysis...")
+profiler.checkpoint('chart 12')
 plt.figure(figsize=(14, 6))
 mileage_bins = [0, 50, 100, 150, 200, 250, 300, 400, 500, 1000]
 mileage_labels = ['0-50K', '50-100K', '100-150K', '150-200K', '200-250K', '250-300K', '300-400K', '400-500K', '500K+']
@@ -279,6 +298,7 @@ plt.close()
 
 # Chart 13: Year-over-Year Listing Activity (2015-2024 vehicles)
 print("13. Recent model year trends...")
+profiler.checkpoint('chart 13')
 plt.figure(figsize=(14, 6))
 recent_years = df[(df['year'] >= 2015) & (df['year'] <= 2024)]
 year_avg_price = recent_years.groupby('year').agg({'year': 'count', 'price': 'mean'}).rename(columns={'year': 'count'})
@@ -305,6 +325,7 @@ plt.close()
 
 # Chart 14: Market Concentration - Brand Market Share Percentage
 print("14. Market concentration analysis...")
+profiler.checkpoint('chart 14')
 plt.figure(figsize=(14, 6))
 top_10_brands = df['brand'].value_counts().head(10)
 other_count = len(df) - top_10_brands.sum()
@@ -327,6 +348,7 @@ plt.close()
 
 # Chart 15: Average Mileage by Vehicle Age
 print("15. Mileage accumulation trends...")
+profiler.checkpoint('chart 15')
 plt.figure(figsize=(14, 6))
 age_mileage = df[(df['vehicle_age'] > 0) & (df['vehicle_age'] <= 25)].groupby('vehicle_age')['mileage_numeric'].mean().reset_index()
 plt.plot(age_mileage['vehicle_age'], age_mileage['mileage_numeric'],
@@ -0,0 +1,176 @@
+"""
+Biturbo.az Profiling Hooks
+Opt-in per-stage timers, CPU profiles and tracemalloc reports for the scraper and
+the analysis/chart scripts. Enable with --profile or BITURBO_PROFILE=1.
+"""
+
+import asyncio
+import atexit
+import contextlib
+import cProfile
+import logging
+import os
+import sys
+import time
+import tracemalloc
+
+logger = logging.getLogger(__name__)
+
+TOP_ALLOCATORS = 15
+
+
+class StageProfiler:
+    """Accumulates wall time and memory per named stage
+
+    stage() times a block and can be entered by many concurrent tasks, in which
+    case the stage total is summed task time rather than elapsed time. Memory is
+    measured as the change in traced memory over the block, which for overlapping
+    blocks includes whatever other tasks allocated while the block was suspended.
+    A stage still open when another task enters a stage therefore reports no
+    allocations; blocks that never await, such as parsing, are unaffected.
+    checkpoint() suits flat scripts: each call ends the previous checkpoint stage.
+    When disabled both are no-ops.
+    """
+
+    def __init__(self, name='run', enabled=False, output_dir='.'):
+        self.name = name
+        self.enabled = enabled
+        self.output_dir = output_dir
+        self.stages = {}  # stage name -> [calls, seconds, bytes allocated]
+        self.open_stages = []          # (stage name, task) of every stage() block being timed
+        self.concurrent_stages = set()  # Stages open while another task entered a stage
+        self.current_checkpoint = None
+        self.cpu_profiler = None
+        self.started = False
+
+    def start(self):
+        """Start the CPU profiler and tracemalloc"""
+        if not self.enabled or self.started:
+            return
+        self.started = True
+        self.start_time = time.perf_counter()
+        tracemalloc.start()
+
+        # Prefer pyinstrument's report when installed, otherwise fall back to cProfile
+        try:
+            from pyinstrument import Profiler
+            self.cpu_profiler = Profiler()
+            self.cpu_profiler.start()
+        except ImportError:
+            self.cpu_profiler = cProfile.Profile()
+            self.cpu_profiler.enable()
+
+    def stop(self):
+        """Stop profiling and write the CPU profile, top allocators and stage timing table"""
+        if not self.started:
+            return
+        self.checkpoint(None)
+        self.started = False
+        total = time.perf_counter() - self.start_time
+
+        # Snapshot before writing the CPU profile so its allocations are not reported
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, cProfile.__file__),
+        ])
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        base_path = os.path.join(self.output_dir, f"profile_{self.name}")
+        if isinstance(self.cpu_profiler, cProfile.Profile):
+            self.cpu_profiler.disable()
+            self.cpu_profiler.dump_stats(f"{base_path}.prof")
+            logger.info(f"cProfile stats written to {base_path}.prof")
+        else:
+            self.cpu_profiler.stop()
+            with open(f"{base_path}.html", 'w', encoding='utf-8') as f:
+                f.write(self.cpu_profiler.output_html())
+            logger.info(f"pyinstrument report written to {base_path}.html")
+
+        lines = [f"Profile: {self.name} ({total:.2f} s wall, {peak / 1024 / 1024:.1f} MiB peak traced)", ""]
+        lines.append(f"{'Stage':<40} {'Calls':>8} {'Total s':>10} {'Mean ms':>10} {'Alloc MiB':>10}")
+        for stage_name, (calls, seconds, allocated) in sorted(self.stages.items(), key=lambda item: -item[1][1]):
+            allocated = '-' if stage_name in self.concurrent_stages else f"{allocated / 1024 / 1024:.2f}"
+            lines.append(
+                f"{stage_name:<40} {calls:>8} {seconds:>10.3f} {seconds / calls * 1000:>10.2f} {allocated:>10}"
+            )
+        if self.concurrent_stages:
+            lines.append("Alloc '-': other tasks ran while the stage was open, so their allocations would be counted")
+
+        lines += ["", f"Top {TOP_ALLOCATORS} allocators:"]
+        for stat in snapshot.statistics('lineno')[:TOP_ALLOCATORS]:
+            lines.append(f"  {stat}")
+
+        report = '\n'.join(lines)
+        with open(f"{base_path}_stages.txt", 'w', encoding='utf-8') as f:
+            f.write(report + '\n')
+        logger.info(f"Stage timings written to {base_path}_stages.txt\n{report}")
+
+    def record(self, stage_name, seconds, allocated):
+        totals = self.stages.setdefault(stage_name, [0, 0.0, 0])
+        totals[0] += 1
+        totals[1] += seconds
+        totals[2] += allocated
+
+    def stage(self, stage_name):
+        """Context manager timing one execution of stage_name"""
+        if not self.started:
+            return contextlib.nullcontext()
+        return self._timed(stage_name)
+
+    @contextlib.contextmanager
+    def _timed(self, stage_name):
+        entry = (stage_name, current_task())
+        for open_name, open_task in self.open_stages:
+            if open_task is not entry[1]:
+                # The open stage is suspended while this task runs and would count its allocations
+                self.concurrent_stages.add(open_name)
+        self.open_stages.append(entry)
+
+        start_memory = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            allocated = max(tracemalloc.get_traced_memory()[0] - start_memory, 0) if tracemalloc.is_tracing() else 0
+            self.record(stage_name, time.perf_counter() - start, allocated)
+            self.open_stages.remove(entry)
+
+    def checkpoint(self, stage_name):
+        """End the running checkpoint stage and start stage_name (None just ends it)"""
+        if not self.started:
+            return
+        now = time.perf_counter()
+        memory = tracemalloc.get_traced_memory()[0]
+        if self.current_checkpoint:
+            previous_name, previous_start, previous_memory = self.current_checkpoint
+            self.record(previous_name, now - previous_start, max(memory - previous_memory, 0))
+        self.current_checkpoint = (stage_name, now, memory) if stage_name else None
+
+
+def current_task():
+    """The running asyncio task, None outside an event loop"""
+    try:
+        return asyncio.current_task()
+    except RuntimeError:
+        return None
+
+
+def profiler_from_args(name):
+    """Create a profiler for this process, started if --profile or BITURBO_PROFILE=1 is given
+
+    --profile is removed from sys.argv so scripts can parse their own arguments.
+    The report is written when the process exits.
+    """
+    enabled = os.environ.get('BITURBO_PROFILE', '') not in ('', '0')
+    if '--profile' in sys.argv:
+        sys.argv.remove('--profile')
+        enabled = True
+
+    profiler = StageProfiler(name, enabled=enabled)
+    if enabled:
+        # The analysis scripts do not configure logging themselves
+        logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+        profiler.start()
+        atexit.register(profiler.stop)
+    return profiler
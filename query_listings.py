@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Biturbo.az Listings Query Service
+In-memory indexes over the scraped CSV for fast filter + sort + paginate queries,
+usable as a Python API or as a local HTTP endpoint
+"""
+
+import bisect
+import csv
+import itertools
+import json
+import logging
+import os
+import re
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Exact-match fields backed by inverted indexes
+INDEXED_FIELDS = ('brand', 'model', 'fuel_type', 'transmission', 'drivetrain')
+
+# Numeric fields backed by sorted arrays, supporting <field>_min / <field>_max and sorting
+RANGE_FIELDS = ('price', 'year', 'mileage')
+
+
+def normalise_value(value):
+    """Case-insensitive key for exact-match fields"""
+    return ' '.join(str(value or '').casefold().split())
+
+
+def parse_number(value):
+    """Numeric value of a field such as '27000' or '184 km', None when missing"""
+    digits = re.sub(r'\D', '', str(value or ''))
+    return int(digits) if digits else None
+
+
+class ListingIndex:
+    """Immutable set of indexes built from one snapshot of the CSV"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.inverted = {field: {} for field in INDEXED_FIELDS}
+        self.sorted_values = {}
+        self.sorted_ids = {}
+        self.missing_ids = {}      # Rows without a value, listed after the sorted rows
+        self.ranks = {}            # row_id -> position in sorted_ids + missing_ids
+        self.descending_ranks = {}  # Same, with the sorted rows reversed and missing rows still last
+
+        for row_id, row in enumerate(rows):
+            for field in INDEXED_FIELDS:
+                self.inverted[field].setdefault(normalise_value(row.get(field)), set()).add(row_id)
+
+        for field in RANGE_FIELDS:
+            numbers = [parse_number(row.get(field)) for row in rows]
+            pairs = sorted((number, row_id) for row_id, number in enumerate(numbers) if number is not None)
+            self.sorted_values[field] = [number for number, _ in pairs]
+            self.sorted_ids[field] = [row_id for _, row_id in pairs]
+            self.missing_ids[field] = [row_id for row_id, number in enumerate(numbers) if number is None]
+
+            present = len(pairs)
+            ranks = [0] * len(rows)
+            descending_ranks = [0] * len(rows)
+            for rank, row_id in enumerate(self.sorted_ids[field]):
+                ranks[row_id] = rank
+                descending_ranks[row_id] = present - 1 - rank
+            for rank, row_id in enumerate(self.missing_ids[field], present):
+                ranks[row_id] = descending_ranks[row_id] = rank
+            self.ranks[field] = ranks
+            self.descending_ranks[field] = descending_ranks
+
+    def rank_range(self, field, minimum=None, maximum=None):
+        """Ranks [lo, hi) of the rows with minimum <= field <= maximum"""
+        values = self.sorted_values[field]
+        lo = 0 if minimum is None else bisect.bisect_left(values, minimum)
+        hi = len(values) if maximum is None else bisect.bisect_right(values, maximum)
+        return lo, hi
+
+
+class ListingStore:
+    """Query API over a scraped listings CSV, reloaded when the file changes"""
+
+    def __init__(self, filename='biturbo_listings.csv'):
+        self.filename = filename
+        self.index = None
+        self.mtime = None
+        self.lock = threading.Lock()
+        self.reload_if_changed()
+
+    def reload_if_changed(self):
+        """Rebuild the indexes if a new crawl has replaced the CSV"""
+        mtime = os.stat(self.filename).st_mtime_ns
+        if mtime == self.mtime:
+            return False
+
+        with self.lock:
+            if mtime == self.mtime:
+                return False
+            with open(self.filename, newline='', encoding='utf-8') as f:
+                rows = list(csv.DictReader(f))
+            # Swap in the new snapshot at once so concurrent queries never see a partial index
+            self.index = ListingIndex(rows)
+            self.mtime = mtime
+
+        logger.info(f"Loaded {len(rows)} listings from {self.filename}")
+        return True
+
+    def query(self, sort=None, descending=False, offset=0, limit=20, **filters):
+        """Filter, sort and paginate listings
+
+        Filters are exact matches on INDEXED_FIELDS (e.g. brand='Toyota') and
+        bounds on RANGE_FIELDS (e.g. year_min=2015, price_max=30000). Returns a
+        dict with the total match count and the requested page of rows.
+        """
+        if offset < 0 or limit < 0:
+            raise ValueError("offset and limit must not be negative")
+
+        self.reload_if_changed()
+        index = self.index
+
+        exact_sets = []
+        rank_bounds = {}  # field -> [lo, hi) ranks allowed by its _min / _max filters
+        for name, value in filters.items():
+            if value is None:
+                continue
+            if name in INDEXED_FIELDS:
+                exact_sets.append(index.inverted[name].get(normalise_value(value), set()))
+            elif name.endswith(('_min', '_max')) and name[:-4] in RANGE_FIELDS:
+                field, bound = name[:-4], name[-3:]
+                lo, hi = rank_bounds.get(field, index.rank_range(field))
+                if bound == 'min':
+                    lo = max(lo, index.rank_range(field, minimum=int(value))[0])
+                else:
+                    hi = min(hi, index.rank_range(field, maximum=int(value))[1])
+                rank_bounds[field] = (lo, hi)
+            else:
+                raise ValueError(f"Unknown filter: {name}")
+
+        if sort is not None and sort not in RANGE_FIELDS:
+            raise ValueError(f"Cannot sort by: {sort}")
+
+        # Intersect the inverted indexes first, smallest set first
+        matches = None  # None means every row matches
+        if exact_sets:
+            exact_sets.sort(key=len)
+            matches = exact_sets[0].intersection(*exact_sets[1:]) if len(exact_sets) > 1 else exact_sets[0]
+
+        # Then check range bounds per remaining row, unless a range is narrower than the
+        # exact matches, in which case its slice of the sorted array is checked instead
+        if rank_bounds:
+            ranges = sorted(rank_bounds.items(), key=lambda item: item[1][1] - item[1][0])
+            field, (lo, hi) = ranges[0]
+            if matches is None or hi - lo < len(matches):
+                exact = matches
+                matches = index.sorted_ids[field][lo:hi]
+                if exact is not None:
+                    matches = [row_id for row_id in matches if row_id in exact]
+                ranges = ranges[1:]
+            for field, (lo, hi) in ranges:
+                ranks = index.ranks[field]
+                matches = [row_id for row_id in matches if lo <= ranks[row_id] < hi]
+
+        if sort is None:
+            walk_order = range(len(index.rows) - 1, -1, -1) if descending else range(len(index.rows))
+        else:
+            sorted_ids = reversed(index.sorted_ids[sort]) if descending else index.sorted_ids[sort]
+            walk_order = itertools.chain(sorted_ids, index.missing_ids[sort])
+
+        if matches is None:
+            total = len(index.rows)
+            page_ids = list(itertools.islice(walk_order, offset, offset + limit))
+        else:
+            total = len(matches)
+            # Walking the presorted order visits about (offset + limit) * N / total rows before
+            # the page is full, so it only beats sorting the matches when they are a large share
+            if (offset + limit) * len(index.rows) < total * total:
+                match_set = matches if isinstance(matches, set) else set(matches)
+                page_ids = list(itertools.islice(
+                    (row_id for row_id in walk_order if row_id in match_set), offset, offset + limit
+                ))
+            elif sort is None:
+                page_ids = sorted(matches, reverse=descending)[offset:offset + limit]
+            else:
+                ranks = index.descending_ranks[sort] if descending else index.ranks[sort]
+                page_ids = sorted(matches, key=ranks.__getitem__)[offset:offset + limit]
+
+        page = [index.rows[row_id] for row_id in page_ids]
+        return {'total': total, 'offset': offset, 'limit': limit, 'results': page}
+
+
+class QueryRequestHandler(BaseHTTPRequestHandler):
+    """GET /listings?brand=Toyota&transmission=Avtomat&year_min=2015&price_max=30000&sort=price"""
+
+    store = None
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path != '/listings':
+            self.send_json(404, {'error': 'Not found'})
+            return
+
+        params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        try:
+            result = self.store.query(
+                sort=params.pop('sort', None),
+                descending=params.pop('order', 'asc') == 'desc',
+                offset=int(params.pop('offset', 0)),
+                limit=int(params.pop('limit', 20)),
+                **params
+            )
+        except ValueError as e:
+            self.send_json(400, {'error': str(e)})
+            return
+
+        self.send_json(200, result)
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+
+def serve(filename='biturbo_listings.csv', host='127.0.0.1', port=8080):
+    """Serve listing queries over HTTP until interrupted"""
+    QueryRequestHandler.store = ListingStore(filename)
+    server = ThreadingHTTPServer((host, port), QueryRequestHandler)
+    logger.info(f"Serving listing queries on http://{host}:{port}/listings")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    try:
+        filename = sys.argv[1] if len(sys.argv) > 1 else 'biturbo_listings.csv'
+        port = int(sys.argv[2]) if len(sys.argv) > 2 else 8080
+    except ValueError:
+        print("Usage: python3 query_listings.py [csv_file] [port]")
+        print("Example: python3 query_listings.py biturbo_listings.csv 8080")
+        sys.exit(1)
+    serve(filename, port=port)
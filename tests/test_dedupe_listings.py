@@ -0,0 +1,225 @@
+import asyncio
+import csv
+
+import pytest
+
+from biturbo_scraper_async import BiturboScraperAsync
+from dedupe_listings import ListingDedupeIndex, dedupe_csv
+
+DESCRIPTION = (
+    'Təcili satılır, ideal vəziyyətdədir, heç bir problemi yoxdur, '
+    'rəngi orijinaldır, motor və sürətlər qutusu super işləyir'
+)
+
+
+def make_listing(listing_id, **fields):
+    record = {
+        'listing_id': listing_id,
+        'brand': 'Hyundai',
+        'model': 'Elantra',
+        'year': '2016',
+        'mileage': '120 000 km',
+        'engine_volume': '1.6 L',
+        'seller_phone': '050-345-81-78',
+        'description': DESCRIPTION,
+        'extras': 'ABS; Kondisioner',
+    }
+    record.update(fields)
+    return record
+
+
+@pytest.fixture
+def original():
+    return make_listing('1000')
+
+
+@pytest.fixture
+def exact_repost():
+    return make_listing('2000')
+
+
+@pytest.fixture
+def text_repost():
+    # Different phone and mileage, so only the SimHash can match it
+    return make_listing('3000', seller_phone='055-111-22-33', mileage='121 000 km')
+
+
+def test_repost_flagged_as_duplicate_of_original(original, exact_repost, text_repost):
+    index = ListingDedupeIndex()
+    assert index.add(original) is None
+    assert index.add(exact_repost) == '1000'
+    assert index.add(text_repost) == '1000'
+
+
+def test_original_not_flagged_when_repost_indexed_first(original, exact_repost):
+    index = ListingDedupeIndex()
+    assert index.add(exact_repost) is None
+    assert index.add(original) is None
+    assert index.add(exact_repost) == '1000'
+
+
+@pytest.mark.parametrize('seed_order', [(0, 1, 2), (2, 1, 0), (1, 2, 0)])
+def test_refetching_both_listings_against_seeded_index(original, exact_repost, text_repost, seed_order):
+    listings = [original, exact_repost, text_repost]
+    index = ListingDedupeIndex()
+    for position in seed_order:
+        index.add(dict(listings[position]))
+
+    # A recurring crawl refetches every listing; only the original survives
+    assert index.add(dict(original)) is None
+    assert index.add(dict(original)) is None
+    assert index.add(dict(exact_repost)) == '1000'
+    assert index.add(dict(text_repost)) == '1000'
+
+
+def test_different_cars_are_not_duplicates(original):
+    index = ListingDedupeIndex()
+    index.add(original)
+    other = make_listing('2000', model='Sonata', seller_phone='070-000-00-00',
+                         description='Tam başqa maşın, yeni rezinlər, servisdən çıxıb')
+    assert index.add(other) is None
+
+
+def test_removed_original_no_longer_flags_its_repost(original, exact_repost, text_repost):
+    index = ListingDedupeIndex()
+    index.add(original)
+    assert index.add(exact_repost) == '1000'
+    index.remove('1000')
+    assert len(index) == 0
+    assert index.add(exact_repost) is None
+    assert index.add(text_repost) == '2000'
+
+
+def test_removing_one_listing_keeps_others_with_the_same_key(original, exact_repost):
+    index = ListingDedupeIndex()
+    index.add(exact_repost)
+    index.add(original)
+    index.remove('1000')
+    assert index.find_duplicate(make_listing('3000')) == '2000'
+
+
+def test_adding_a_listing_again_replaces_its_entry(original):
+    index = ListingDedupeIndex()
+    index.add(original)
+    index.add(make_listing('1000', model='Sonata', description='Tam başqa maşın, yeni rezinlər, servisdən çıxıb'))
+    assert index.add(make_listing('2000')) is None
+
+
+def test_missing_identity_fields_do_not_match():
+    index = ListingDedupeIndex()
+    assert index.add(make_listing('1', seller_phone='', description='')) is None
+    assert index.add(make_listing('2', seller_phone='', description='')) is None
+
+
+def test_dedupe_csv_keeps_lowest_listing_id(tmp_path, original, exact_repost):
+    input_file = tmp_path / 'listings.csv'
+    output_file = tmp_path / 'deduped.csv'
+    fieldnames = list(original)
+    with open(input_file, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerow(exact_repost)
+        writer.writerow(original)
+
+    assert dedupe_csv(str(input_file), str(output_file)) == 1
+    with open(output_file, newline='', encoding='utf-8') as f:
+        assert [row['listing_id'] for row in csv.DictReader(f)] == ['1000']
+
+
+SEARCH_URL = 'https://www.biturbo.az/az/axtar'
+
+
+def detail_page(listing_id):
+    return (
+        '<h2 class="product-name">Hyundai Elantra</h2>'
+        '<a class="phone">050-345-81-78</a>'
+        f'<div class="product-statistics"><p>Elanın nömrəsi: {listing_id}</p></div>'
+        '<ul class="product-properties">'
+        '<li class="product-properties-i"><label>Marka</label><div class="product-properties-value">Hyundai</div></li>'
+        '<li class="product-properties-i"><label>Model</label><div class="product-properties-value">Elantra</div></li>'
+        '<li class="product-properties-i"><label>Buraxılış ili</label><div class="product-properties-value">2016</div></li>'
+        '</ul>'
+        f'<p class="product-text">{DESCRIPTION}</p>'
+    )
+
+
+def site_pages(listing_ids):
+    """Index page and detail pages of a site listing listing_ids on its first index page"""
+    urls = [f'https://www.biturbo.az/az/avtomobil-elanlari/hyundai-elantra-{i}/' for i in listing_ids]
+    pages = {f'{SEARCH_URL}/': ''.join(
+        f'<div class="products-i"><a class="products-i-link" href="{url}">x</a></div>' for url in urls
+    )}
+    pages.update((url, detail_page(i)) for url, i in zip(urls, listing_ids))
+    return pages
+
+
+def crawl(cache_file, listing_ids, monkeypatch):
+    """One scrape of a site listing listing_ids"""
+    pages = site_pages(listing_ids)
+
+    async def get_page(url, semaphore, retries=3, stream=False):
+        return pages.get(url)
+
+    async def no_sleep(seconds):
+        pass
+
+    async def run():
+        scraper = BiturboScraperAsync(cache_file=str(cache_file), dedupe=True)
+        scraper.get_page = get_page
+        scraper.load_parse_cache()
+        records = await scraper.scrape_listings(SEARCH_URL, start_page=1, end_page=1)
+        scraper.save_parse_cache()
+        return [record['listing_id'] for record in records]
+
+    monkeypatch.setattr(asyncio, 'sleep', no_sleep)
+    return asyncio.run(run())
+
+
+def test_repost_kept_after_original_is_deleted(tmp_path, monkeypatch):
+    cache_file = tmp_path / 'cache.json'
+    assert crawl(cache_file, ['1000'], monkeypatch) == ['1000']
+    # The dealer deletes 1000 and reposts the car as 2000
+    assert crawl(cache_file, ['2000'], monkeypatch) == ['2000']
+    # While both are listed only the original is kept
+    assert crawl(cache_file, ['2000', '1000'], monkeypatch) == ['1000']
+
+
+def test_daemon_keeps_repost_once_original_is_dropped(tmp_path):
+    output_file = tmp_path / 'listings.csv'
+    site = site_pages(['1000', '2000'])
+
+    async def get_page(url, semaphore, retries=3, stream=False):
+        return site.get(url)
+
+    def output_ids():
+        if not output_file.exists():
+            return []
+        with open(output_file, newline='', encoding='utf-8') as f:
+            return [row['listing_id'] for row in csv.DictReader(f)]
+
+    async def run():
+        scraper = BiturboScraperAsync(dedupe=True)
+        scraper.get_page = get_page
+        stop_event = asyncio.Event()
+        daemon = asyncio.create_task(scraper.run_daemon(
+            stop_event, str(output_file), SEARCH_URL, poll_pages=1, poll_interval=0.001, recrawl_interval=0,
+        ))
+
+        async def wait_for_output(expected):
+            for _ in range(500):
+                if output_ids() == expected:
+                    return True
+                await asyncio.sleep(0.01)
+            return False
+
+        try:
+            assert await wait_for_output(['1000'])
+            # The dealer deletes 1000 and only the repost stays listed
+            site.clear()
+            site.update(site_pages(['2000']))
+            assert await wait_for_output(['2000'])
+        finally:
+            stop_event.set()
+            await daemon
+
+    asyncio.run(run())
@@ -0,0 +1,86 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from biturbo_scraper_async import BiturboScraperAsync
+from fetch_scheduler import SECONDS_PER_DAY, DetailFetchScheduler, parse_updated_date
+
+NOW = datetime(2024, 3, 20).timestamp()
+
+
+def url(listing_id):
+    return f'https://www.biturbo.az/az/avtomobil-elanlari/kia-rio-{listing_id}/'
+
+
+def cached(days_ago=1, views_velocity=0.0, updated_date=''):
+    return {
+        'hash': 'x',
+        'record': {'updated_date': updated_date},
+        'fetched_at': NOW - days_ago * SECONDS_PER_DAY,
+        'views_velocity': views_velocity,
+    }
+
+
+def schedule(parse_cache, listing_ids, budget=None):
+    scheduler = DetailFetchScheduler(parse_cache, BiturboScraperAsync.listing_id_from_url, now=NOW)
+    return [BiturboScraperAsync.listing_id_from_url(u) for u in scheduler.schedule(map(url, listing_ids), budget)]
+
+
+def test_new_listings_come_first():
+    parse_cache = {'1': cached(days_ago=365, views_velocity=1000, updated_date='19 Mart 2024')}
+    assert schedule(parse_cache, ['1', '2']) == ['2', '1']
+
+
+def test_older_fetches_come_first():
+    parse_cache = {'1': cached(days_ago=1), '2': cached(days_ago=10), '3': cached(days_ago=5)}
+    assert schedule(parse_cache, ['1', '2', '3']) == ['2', '3', '1']
+
+
+def test_faster_gaining_views_come_first():
+    parse_cache = {'1': cached(views_velocity=5), '2': cached(views_velocity=50)}
+    assert schedule(parse_cache, ['1', '2']) == ['2', '1']
+
+
+def test_recently_updated_come_first():
+    parse_cache = {
+        '1': cached(updated_date='1 Yanvar 2024'),
+        '2': cached(updated_date='19 Mart 2024'),
+        '3': cached(updated_date='not a date'),
+    }
+    assert schedule(parse_cache, ['3', '1', '2']) == ['2', '1', '3']
+
+
+def test_equal_priorities_keep_index_order():
+    parse_cache = {'1': cached(), '2': cached()}
+    assert schedule(parse_cache, ['4', '3', '2', '1']) == ['4', '3', '2', '1']
+
+
+@pytest.mark.parametrize('budget, expected', [(None, ['3', '2', '1']), (2, ['3', '2']), (0, []), (-1, []), (10, ['3', '2', '1'])])
+def test_budget_cuts_lowest_priorities(budget, expected):
+    parse_cache = {'1': cached(days_ago=1), '2': cached(days_ago=2)}
+    assert schedule(parse_cache, ['1', '2', '3'], budget) == expected
+
+
+def test_duplicate_listing_ids_are_queued_once():
+    scheduler = DetailFetchScheduler({}, BiturboScraperAsync.listing_id_from_url, now=NOW)
+    for listing_url in [url('1'), url('1').rstrip('/'), url('2'), url('1')]:
+        scheduler.push(listing_url)
+    assert len(scheduler) == 2
+    assert scheduler.schedule([]) == [url('1'), url('2')]
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('23 Dekabr 2024', datetime(2024, 12, 23)),
+    ('Yeniləndi: 5 İyun 2023', datetime(2023, 6, 5)),
+    ('31 Fevral 2024', None),
+    ('', None),
+])
+def test_parse_updated_date(value, expected):
+    assert parse_updated_date(value) == expected
+
+
+def test_warm_up_spends_no_budget():
+    scraper = BiturboScraperAsync(request_budget=10)
+    asyncio.run(scraper.warm_up())
+    assert scraper.remaining_budget() == 10
@@ -0,0 +1,67 @@
+import asyncio
+
+from biturbo_scraper_async import BiturboScraperAsync, extract_product_sections
+
+URL = 'https://www.biturbo.az/az/avtomobil-elanlari/kia-rio-1234/'
+
+
+def detail_page(price='15 000', views='5', similar='Hyundai Elantra'):
+    return (
+        '<html><head><meta name="csrf-token" content="abc123"></head><body>'
+        '<h2 class="product-name">Kia Rio</h2>'
+        f'<div class="product-price"><span>{price}</span> AZN</div>'
+        '<div class="seller-name"><p>Elxan</p></div>'
+        '<a class="phone" href="tel:0503458178">050-345-81-78</a>'
+        '<div class="product-statistics"><p>Elanın nömrəsi: 1234</p>'
+        f'<div><p>Baxışların sayı: {views}</p></div><p>Yeniləndi: 12 Mart 2024</p></div>'
+        '<ul class="product-properties">'
+        '<li class="product-properties-i"><label>Marka</label><div class="product-properties-value">Kia</div></li>'
+        '<li class="product-properties-i"><label>Buraxılış ili</label><div class="product-properties-value">2015</div></li>'
+        '</ul>'
+        '<div class="product-extras"><p class="product-extras-i">ABS</p><p class="product-extras-i">Lyuk</p></div>'
+        '<p class="product-text">Təcili satılır &amp; dəyişmək olar</p>'
+        f'<div class="ad-slot">{similar}</div>'
+        '</body></html>'
+    )
+
+
+def scraper_serving(pages):
+    scraper = BiturboScraperAsync()
+    served = iter(pages)
+
+    async def get_page(url, semaphore, retries=3, stream=False):
+        return next(served)
+
+    scraper.get_page = get_page
+    return scraper
+
+
+def fetch(scraper):
+    return asyncio.run(scraper.extract_listing_details(URL, asyncio.Semaphore(1)))
+
+
+def test_sections_parse_like_the_whole_page():
+    scraper = BiturboScraperAsync()
+    page = detail_page()
+    assert scraper.parse_listing_details(URL, extract_product_sections(page)) == scraper.parse_listing_details(URL, page)
+
+
+def test_unchanged_listing_reuses_cached_record_with_fresh_views(monkeypatch):
+    scraper = scraper_serving([detail_page(views='5'), detail_page(views='9', similar='Toyota Camry')])
+    first = fetch(scraper)
+    assert first['views'] == '5' and first['price'] == '15000'
+
+    def fail_parse(*args):
+        raise AssertionError('unchanged listing was reparsed')
+
+    monkeypatch.setattr(scraper, 'parse_listing_details', fail_parse)
+    second = fetch(scraper)
+    assert second['views'] == '9'
+    assert {**second, 'views': '5'} == first
+
+
+def test_changed_listing_is_reparsed():
+    scraper = scraper_serving([detail_page(price='15 000'), detail_page(price='14 500')])
+    fetch(scraper)
+    assert fetch(scraper)['price'] == '14500'
+    assert scraper.parse_cache['1234']['record']['price'] == '14500'
@@ -0,0 +1,130 @@
+import csv
+import random
+
+import pytest
+
+from query_listings import ListingStore, parse_number
+
+FIELDNAMES = ['listing_id', 'brand', 'model', 'transmission', 'price', 'year', 'mileage']
+
+ROWS = [
+    {'listing_id': '1', 'brand': 'Toyota', 'model': 'Camry', 'transmission': 'Avtomat',
+     'price': '30500', 'year': '2017', 'mileage': '90 km'},
+    {'listing_id': '2', 'brand': 'Toyota', 'model': 'Corolla', 'transmission': 'Avtomat',
+     'price': '27800', 'year': '2015', 'mileage': '140 km'},
+    {'listing_id': '3', 'brand': 'Toyota', 'model': 'Prius', 'transmission': 'Variator',
+     'price': '', 'year': '2012', 'mileage': ''},
+    {'listing_id': '4', 'brand': 'LADA', 'model': '2107', 'transmission': 'Mexaniki',
+     'price': '6000', 'year': '2010', 'mileage': '200 km'},
+]
+
+
+def write_store(tmp_path, rows):
+    filename = tmp_path / 'listings.csv'
+    with open(filename, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
+        writer.writeheader()
+        writer.writerows(rows)
+    return ListingStore(str(filename))
+
+
+@pytest.fixture
+def store(tmp_path):
+    return write_store(tmp_path, ROWS)
+
+
+def ids(result):
+    return [row['listing_id'] for row in result['results']]
+
+
+def test_filters_combine(store):
+    result = store.query(brand='toyota', transmission='Avtomat', year_min=2015, price_max=30000)
+    assert result['total'] == 1
+    assert ids(result) == ['2']
+
+
+@pytest.mark.parametrize('descending', [False, True])
+def test_sorting_keeps_rows_without_a_value_at_the_end(store, descending):
+    unsorted = store.query(brand='Toyota')
+    result = store.query(brand='Toyota', sort='price', descending=descending)
+    assert result['total'] == unsorted['total'] == 3
+    assert ids(result) == (['1', '2', '3'] if descending else ['2', '1', '3'])
+
+
+def test_pagination(store):
+    result = store.query(sort='year', offset=1, limit=2)
+    assert result['total'] == 4
+    assert ids(result) == ['3', '2']
+
+
+@pytest.mark.parametrize('params', [{'offset': -1}, {'limit': -1}])
+def test_negative_offset_or_limit_rejected(store, params):
+    with pytest.raises(ValueError):
+        store.query(**params)
+
+
+def test_unknown_filter_rejected(store):
+    with pytest.raises(ValueError):
+        store.query(colour='red')
+
+
+def random_rows(count, seed=7):
+    rng = random.Random(seed)
+    return [
+        {'listing_id': str(i), 'brand': rng.choice(['Toyota', 'Kia', 'LADA']), 'model': rng.choice(['A', 'B']),
+         'transmission': rng.choice(['Avtomat', 'Mexaniki']),
+         'price': '' if rng.random() < 0.1 else str(rng.randint(1, 50) * 1000),
+         'year': str(rng.randint(2000, 2024)), 'mileage': f"{rng.randint(0, 300)} km"}
+        for i in range(count)
+    ]
+
+
+def brute_force(rows, sort=None, descending=False, offset=0, limit=20, **filters):
+    matches = []
+    for row_id, row in enumerate(rows):
+        ok = True
+        for name, value in filters.items():
+            if name.endswith('_min'):
+                number = parse_number(row[name[:-4]])
+                ok = ok and number is not None and number >= value
+            elif name.endswith('_max'):
+                number = parse_number(row[name[:-4]])
+                ok = ok and number is not None and number <= value
+            else:
+                ok = ok and row[name].casefold() == value.casefold()
+        if ok:
+            matches.append(row_id)
+
+    if sort is None:
+        ordered = sorted(matches, reverse=descending)
+    else:
+        present = sorted((parse_number(rows[row_id][sort]), row_id) for row_id in matches
+                         if parse_number(rows[row_id][sort]) is not None)
+        if descending:
+            present.reverse()
+        ordered = [row_id for _, row_id in present] + [
+            row_id for row_id in matches if parse_number(rows[row_id][sort]) is None
+        ]
+    return len(matches), [rows[row_id]['listing_id'] for row_id in ordered[offset:offset + limit]]
+
+
+@pytest.mark.parametrize('filters', [
+    {},
+    {'brand': 'toyota'},
+    {'brand': 'Kia', 'transmission': 'Avtomat'},
+    {'year_min': 2010},
+    {'year_min': 2010, 'year_max': 2012},
+    {'price_max': 5000},
+    {'brand': 'LADA', 'price_min': 20000, 'mileage_max': 100},
+    {'brand': 'Toyota', 'model': 'A', 'transmission': 'Mexaniki', 'year_min': 2015, 'price_max': 30000},
+])
+@pytest.mark.parametrize('sort', [None, 'price', 'year'])
+@pytest.mark.parametrize('descending', [False, True])
+@pytest.mark.parametrize('offset, limit', [(0, 5), (3, 20), (0, 1000)])
+def test_query_matches_brute_force(tmp_path, filters, sort, descending, offset, limit):
+    # Small and large pages exercise both walking the sorted order and sorting the matches
+    rows = random_rows(400)
+    result = write_store(tmp_path, rows).query(sort=sort, descending=descending, offset=offset, limit=limit, **filters)
+    total, expected_ids = brute_force(rows, sort, descending, offset, limit, **filters)
+    assert result['total'] == total
+    assert ids(result) == expected_ids
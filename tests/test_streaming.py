@@ -0,0 +1,92 @@
+import asyncio
+import inspect
+import re
+
+import pytest
+
+import biturbo_scraper_async
+from biturbo_scraper_async import (
+    DETAIL_SECTIONS, BiturboScraperAsync, ProductSectionWatcher, extract_product_sections,
+)
+
+
+def test_detail_sections_cover_every_top_level_selector():
+    source = inspect.getsource(BiturboScraperAsync.parse_listing_details)
+    selectors = set(re.findall(r"soup\.find\('(\w+)', class_='([\w-]+)'\)", source))
+    assert selectors == set(DETAIL_SECTIONS)
+
+
+BLOCKS = [
+    '<h2 class="product-name">Kia Rio</h2>',
+    '<div class="product-price"><span>15 000</span> AZN</div>',
+    '<div class="seller-name"><p>Elxan</p></div>',
+    '<a class="phone" href="tel:0503458178">0503458178</a>',
+    '<div class="product-statistics"><p>Elanın nömrəsi: 1</p><div><p>Baxışların sayı: 5</p></div></div>',
+    '<ul class="product-properties"><li class="product-properties-i"><label>Marka</label></li></ul>',
+    '<div class="product-extras"><p class="product-extras-i">ABS</p></div>',
+    '<p class="product-text">Təcili satılır</p>',
+]
+
+SIMILAR = '<div class="products-i"><a class="products-i-link" href="/az/x-2/">x</a></div>' * 50
+
+
+def page(*blocks, header=''):
+    return f'<html><body>{header}' + ''.join(blocks) + f'<section>{SIMILAR}</section></body></html>'
+
+
+class FakeContent:
+    def __init__(self, body):
+        self.body = body
+        self.chunks_read = 0
+
+    async def iter_chunked(self, size):
+        for start in range(0, len(self.body), size):
+            self.chunks_read += 1
+            yield self.body[start:start + size]
+
+
+class FakeResponse:
+    charset = 'utf-8'
+
+    def __init__(self, html):
+        self.content = FakeContent(html.encode('utf-8'))
+
+
+def stream(html, monkeypatch, chunk_size=7):
+    monkeypatch.setattr(biturbo_scraper_async, 'STREAM_CHUNK_SIZE', chunk_size)
+    response = FakeResponse(html)
+    content = asyncio.run(BiturboScraperAsync().read_product_section(response))
+    return content, response.content
+
+
+@pytest.mark.parametrize('blocks', [BLOCKS, BLOCKS[::-1], BLOCKS[:3] + BLOCKS[4:5]])
+def test_stops_at_similar_listings_whichever_blocks_are_present(blocks, monkeypatch):
+    html = page(*blocks)
+    content, body = stream(html, monkeypatch)
+    assert content == html[:html.index('<div class="products-i"')]
+    assert body.chunks_read * 7 < len(body.body)
+
+
+def test_listing_cards_before_the_product_section_do_not_stop_it(monkeypatch):
+    html = page(*BLOCKS, header=SIMILAR)
+    content, _ = stream(html, monkeypatch)
+    assert extract_product_sections(content) == ''.join(BLOCKS)
+
+
+def test_reads_whole_page_without_similar_listings(monkeypatch):
+    html = '<html><body>' + ''.join(BLOCKS) + '</body></html>'
+    content, _ = stream(html, monkeypatch)
+    assert content == html
+
+
+def test_streamed_and_full_pages_extract_the_same_sections(monkeypatch):
+    html = page(*BLOCKS)
+    content, _ = stream(html, monkeypatch)
+    assert extract_product_sections(content) == extract_product_sections(html) == ''.join(BLOCKS)
+
+
+def test_nested_tags_stay_inside_their_block():
+    watcher = ProductSectionWatcher([('div', 'product-statistics')])
+    watcher.feed('<div class="product-statistics"><div><p>1</p></div>')
+    watcher.feed('<br/></div><div class="product-statistics">second</div>')
+    assert watcher.section_html == '<div class="product-statistics"><div><p>1</p></div><br/></div>'